@@ -15,9 +15,15 @@ from __future__ import annotations
 
 __all__ = ['inspect', 'inspectorFor', 'Inspector', 'ModuleInspector', 'ClassInspector', 'InstanceInspector', 'FunctionInspector', 'InstanceMethodInspector', 'CodeInspector', 'ComplexInspector', 'DictionaryInspector', 'SequenceInspector', 'SliceInspector', 'InspectorWindow']
 
+from direct.directnotify.DirectNotifyGlobal import directNotify
+import functools
+import itertools
+import weakref
 import Pmw
 import tkinter as tk
 
+notify = directNotify.newCategory('Inspector')
+
 ### public API
 
 
@@ -32,56 +38,68 @@ def inspect(anObject):
 
 ### private
 
-_InspectorMap: dict[str, str]
+# Maps the capitalized name of a type onto the name of the inspector class
+# that should be used to inspect objects of that type.
+_InspectorMap: dict[str, str] = {
+    'Builtin_function_or_methodType': 'FunctionInspector',
+    'BuiltinFunctionType': 'FunctionInspector',
+    'BuiltinMethodType': 'FunctionInspector',
+    'ClassType': 'ClassInspector',
+    'CodeType': 'CodeInspector',
+    'ComplexType': 'Inspector',
+    'DictionaryType': 'DictionaryInspector',
+    'DictType': 'DictionaryInspector',
+    'FileType': 'Inspector',
+    'FloatType': 'Inspector',
+    'FunctionType': 'FunctionInspector',
+    'Instance methodType': 'InstanceMethodInspector',
+    'InstanceType': 'InstanceInspector',
+    'IntType': 'Inspector',
+    'LambdaType': 'Inspector',
+    'ListType': 'SequenceInspector',
+    'LongType': 'Inspector',
+    'MethodType': 'FunctionInspector',
+    'ModuleType': 'ModuleInspector',
+    'NoneType': 'Inspector',
+    'SliceType': 'SliceInspector',
+    'StringType': 'SequenceInspector',
+    'TupleType': 'SequenceInspector',
+    'TypeType': 'Inspector',
+    'UnboundMethodType': 'FunctionInspector',
+    # These don't have a specialized inspector yet
+    **{typeName: 'Inspector' for typeName in (
+        'BufferType', 'EllipsisType', 'FrameType', 'TracebackType', 'XRangeType')},
+}
+
+# The same, but with the inspector classes themselves, filled in once the
+# classes have been defined.
+_InspectorClassMap: dict[str, type]
+
+# Maps a type object directly onto the inspector class to use for it, filled
+# in lazily by inspectorFor so that repeated lookups skip building the type
+# name.  The keys are weak so that types created at runtime can still go away.
+_InspectorClassCache: weakref.WeakKeyDictionary[type, type] = weakref.WeakKeyDictionary()
 
 
 def inspectorFor(anObject):
-    typeName = type(anObject).__name__.capitalize() + 'Type'
-    if typeName in _InspectorMap:
-        inspectorName = _InspectorMap[typeName]
-    else:
-        print(("Can't find an inspector for " + typeName))
-        inspectorName = 'Inspector'
-    inspector = globals()[inspectorName](anObject)
-    return inspector
-
-
-### initializing
-
-def initializeInspectorMap() -> None:
-    global _InspectorMap
-    notFinishedTypes = ['BufferType',  'EllipsisType',  'FrameType', 'TracebackType', 'XRangeType']
-
-    _InspectorMap = {
-        'Builtin_function_or_methodType': 'FunctionInspector',
-        'BuiltinFunctionType': 'FunctionInspector',
-        'BuiltinMethodType': 'FunctionInspector',
-        'ClassType': 'ClassInspector',
-        'CodeType': 'CodeInspector',
-        'ComplexType': 'Inspector',
-        'DictionaryType': 'DictionaryInspector',
-        'DictType': 'DictionaryInspector',
-        'FileType': 'Inspector',
-        'FloatType': 'Inspector',
-        'FunctionType': 'FunctionInspector',
-        'Instance methodType': 'InstanceMethodInspector',
-        'InstanceType': 'InstanceInspector',
-        'IntType': 'Inspector',
-        'LambdaType': 'Inspector',
-        'ListType': 'SequenceInspector',
-        'LongType': 'Inspector',
-        'MethodType': 'FunctionInspector',
-        'ModuleType': 'ModuleInspector',
-        'NoneType': 'Inspector',
-        'SliceType': 'SliceInspector',
-        'StringType': 'SequenceInspector',
-        'TupleType': 'SequenceInspector',
-        'TypeType': 'Inspector',
-        'UnboundMethodType': 'FunctionInspector',
-    }
-
-    for each in notFinishedTypes:
-        _InspectorMap[each] = 'Inspector'
+    objectType = type(anObject)
+    inspectorClass = _InspectorClassCache.get(objectType)
+    if inspectorClass is None:
+        typeName = objectType.__name__.capitalize() + 'Type'
+        inspectorClass = _InspectorClassMap.get(typeName)
+        if inspectorClass is None:
+            if notify.getDebug():
+                notify.debug("Can't find an inspector for " + typeName)
+            inspectorClass = Inspector
+        _InspectorClassCache[objectType] = inspectorClass
+    return inspectorClass(anObject)
+
+
+@functools.lru_cache(maxsize=128)
+def _compileEval(command):
+    # Users tend to evaluate the same expressions over and over, so there is
+    # no need to parse and compile them again every time.
+    return compile(command, '<inspector>', 'eval')
 
 
 ### Classes
@@ -91,20 +109,24 @@ class Inspector:
         self.object = anObject
         self.lastPartNumber = 0
         self.initializePartsList()
-        self.initializePartNames()
 
     def __str__(self):
         return __name__ + '(' + str(self.object) + ')'
 
     def initializePartsList(self):
         self._partsList = []
-        for each in sorted(self.namedParts()):
-            self._partsList.append(each)
-            #if not callable(getattr(self.object, each)):
-            #    self._partsList.append(each)
-
-    def initializePartNames(self):
-        self._partNames = ['up'] + [str(each) for each in self._partsList]
+        self._partNames = ['up']
+        self.addParts(sorted(self.namedParts()))
+
+    def addParts(self, parts):
+        """Appends the given parts to the parts list, along with their names,
+        in a single pass."""
+        partsAppend = self._partsList.append
+        namesAppend = self._partNames.append
+        for each in parts:
+            partsAppend(each)
+            # Most parts are attribute names, which need no conversion.
+            namesAppend(each if type(each) is str else str(each))
 
     def title(self):
         "Subclasses may override."
@@ -159,7 +181,7 @@ class ModuleInspector(Inspector):
 
 class ClassInspector(Inspector):
     def namedParts(self):
-        return ['__bases__'] + list(self.object.__dict__.keys())
+        return itertools.chain(('__bases__',), self.object.__dict__)
 
     def title(self):
         return self.object.__name__ + ' Class'
@@ -170,7 +192,7 @@ class InstanceInspector(Inspector):
         return self.object.__class__.__name__
 
     def namedParts(self):
-        return ['__class__'] + dir(self.object)
+        return itertools.chain(('__class__',), dir(self.object))
 
 ###
 
@@ -203,15 +225,16 @@ class DictionaryInspector(Inspector):
 
     def initializePartsList(self):
         Inspector.initializePartsList(self)
-        for each in sorted(self.object):
-            self._partsList.append(each)
+        # Parts from this index onward are keys rather than attribute names
+        self._dictKeyStart = len(self._partsList)
+        self.addParts(sorted(self.object))
 
     def partNumber(self, partNumber):
         self.lastPartNumber = partNumber
         if partNumber == 0:
             return self.object
         key = self.privatePartNumber(partNumber)
-        if key in self.object:
+        if partNumber - 1 >= self._dictKeyStart:
             return self.object[key]
         else:
             return getattr(self.object, key)
@@ -220,8 +243,7 @@ class DictionaryInspector(Inspector):
 class SequenceInspector(Inspector):
     def initializePartsList(self):
         Inspector.initializePartsList(self)
-        for each in range(len(self.object)):
-            self._partsList.append(each)
+        self.addParts(range(len(self.object)))
 
     def partNumber(self, partNumber):
         self.lastPartNumber = partNumber
@@ -240,15 +262,17 @@ class SliceInspector(Inspector):
 
 
 ### Initialization
-initializeInspectorMap()
+_InspectorClassMap = {typeName: globals()[inspectorName]
+                      for typeName, inspectorName in _InspectorMap.items()}
 
 
 class InspectorWindow:
     def __init__(self, inspector):
         self.inspectors = [inspector]
+        self._popupBuilders = None
 
     def topInspector(self):
-        return self.inspectors[len(self.inspectors) - 1]
+        return self.inspectors[-1]
 
     def selectedPart(self):
         return self.topInspector().selectedPart()
@@ -282,15 +306,14 @@ class InspectorWindow:
         # If you click in the list box, take focus so you can navigate
         # with the cursor keys
         listbox = listWidget.component('listbox')
-        listbox.bind('<ButtonPress-1>',
-                        lambda e, l = listbox: l.focus_set())
+        listbox.bind('<ButtonPress-1>', self._focusListbox)
         listbox.bind('<ButtonRelease-1>',  self.listSelectionChanged)
         listbox.bind('<Double-Button-1>', self.popOrDive)
         listbox.bind('<ButtonPress-3>', self.popupMenu)
         listbox.bind('<KeyRelease-Up>',  self.listSelectionChanged)
         listbox.bind('<KeyRelease-Down>',  self.listSelectionChanged)
-        listbox.bind('<KeyRelease-Left>', lambda e, s = self: s.pop())
-        listbox.bind('<KeyRelease-Right>', lambda e, s = self: s.dive())
+        listbox.bind('<KeyRelease-Left>', self._onLeft)
+        listbox.bind('<KeyRelease-Right>', self._onRight)
         listbox.bind('<Return>',  self.popOrDive)
 
     def createTextWidgets(self):
@@ -322,10 +345,11 @@ class InspectorWindow:
         helpMenu.add_command(label='Instructions', command=self.showHelp)
 
     def fillList(self):
-        self.listWidget.delete(0, tk.END)
-        for each in self.topInspector().partNames():
-            self.listWidget.insert(tk.END, each)
-        self.listWidget.select_clear(0)
+        lw = self.listWidget
+        lw.delete(0, tk.END)
+        # Insert everything in a single Tcl call.
+        lw.insert(tk.END, *self.topInspector().partNames())
+        lw.select_clear(0)
 
     # Event Handling
     def listSelectionChanged(self, event):
@@ -333,10 +357,21 @@ class InspectorWindow:
         if partNumber is None:
             partNumber = 0
         string = self.topInspector().stringForPartNumber(partNumber)
-        self.textWidget.component('text').configure(state = 'normal')
-        self.textWidget.delete('1.0', tk.END)
-        self.textWidget.insert(tk.END, string)
-        self.textWidget.component('text').configure(state = 'disabled')
+        textWidget = self.textWidget
+        text = textWidget.component('text')
+        text.configure(state = 'normal')
+        textWidget.delete('1.0', tk.END)
+        textWidget.insert(tk.END, string)
+        text.configure(state = 'disabled')
+
+    def _focusListbox(self, event):
+        event.widget.focus_set()
+
+    def _onLeft(self, event):
+        self.pop()
+
+    def _onRight(self, event):
+        self.dive()
 
     def popOrDive(self, event):
         """The list has been double-clicked. If the selection is 'self' then pop,
@@ -359,7 +394,7 @@ class InspectorWindow:
             if command:
                 partDict = {'this': self.selectedPart(),
                             'object': self.topInspector().object}
-                result = eval(command, partDict)
+                result = eval(_compileEval(command), partDict)
                 self.commandWidget.insert(tk.INSERT, repr(result) + '\n>>> ')
                 self.commandWidget.see(tk.INSERT)
 
@@ -372,7 +407,7 @@ class InspectorWindow:
 
     def pop(self):
         if len(self.inspectors) > 1:
-            self.inspectors = self.inspectors[:-1]
+            self.inspectors.pop()
             self.update()
 
     def dive(self):
@@ -383,20 +418,21 @@ class InspectorWindow:
         self.update()
 
     def update(self):
+        lw = self.listWidget
         self.setTitle()
         self.fillList()
         # What is active part in this inspector
         partNumber = self.topInspector().getLastPartNumber()
-        self.listWidget.select_clear(0)
-        self.listWidget.activate(partNumber)
-        self.listWidget.select_set(partNumber)
+        lw.select_clear(0)
+        lw.activate(partNumber)
+        lw.select_set(partNumber)
         self.listSelectionChanged(None)
         # Make sure selected item is visible
-        self.listWidget.see(partNumber)
+        lw.see(partNumber)
         # Make sure left side of listbox visible
-        self.listWidget.xview_moveto(0.0)
+        lw.xview_moveto(0.0)
         # Grab focus in listbox
-        self.listWidget.component('listbox').focus_set()
+        lw.component('listbox').focus_set()
 
     def showHelp(self):
         from direct.showbase import ShowBaseGlobal
@@ -412,45 +448,60 @@ class InspectorWindow:
 
     #Private
     def selectedIndex(self):
-        indices = list(map(int, self.listWidget.curselection()))
-        if len(indices) == 0:
+        selection = self.listWidget.curselection()
+        if not selection:
             return None
-        partNumber = indices[0]
-        return partNumber
+        return int(selection[0])
 
     def inspectorForSelectedPart(self):
         partNumber = self.selectedIndex()
         if partNumber is None:
             return None
-        part = self.topInspector().partNumber(partNumber)
-        return self.topInspector().inspectorFor(part)
+        top = self.topInspector()
+        part = top.partNumber(partNumber)
+        return top.inspectorFor(part)
 
     def popupMenu(self, event):
-        print(event)
         partNumber = self.selectedIndex()
-        print(partNumber)
         if partNumber is None:
             return
         part = self.topInspector().partNumber(partNumber)
-        print(part)
+        if notify.getDebug():
+            notify.debug('popupMenu: part %s = %s' % (partNumber, part))
+        menuList = self.popupMenuListFor(part)
+        if menuList is None:
+            return
+        popupMenu = self.createPopupMenu(part, menuList)
+        popupMenu.post(event.widget.winfo_pointerx(),
+                       event.widget.winfo_pointery())
+
+    def popupMenuListFor(self, part):
+        """Returns the list of (label, function) pairs to show in the popup
+        menu for the given part, or None if it has no popup menu."""
+        popupBuilders = self._popupBuilders
+        if popupBuilders is None:
+            # Only import the types the first time a popup is requested.
+            from panda3d.core import NodePath
+            from direct.fsm import ClassicFSM
+            popupBuilders = self._popupBuilders = {
+                NodePath: self._nodePathMenuList,
+                ClassicFSM.ClassicFSM: self._classicFSMMenuList,
+            }
+        for cls in type(part).__mro__:
+            builder = popupBuilders.get(cls)
+            if builder is not None:
+                return builder()
+        return None
+
+    def _nodePathMenuList(self):
         from panda3d.core import NodePath
-        from direct.fsm import ClassicFSM
-        popupMenu = None
-        if isinstance(part, NodePath):
-            popupMenu = self.createPopupMenu(
-                part,
-                [('Explore', NodePath.explore),
-                 ('Place', NodePath.place),
-                 ('Set Color', NodePath.rgbPanel)])
-        elif isinstance(part, ClassicFSM.ClassicFSM):
-            from . import FSMInspector
-            popupMenu = self.createPopupMenu(
-                part,
-                [('Inspect ClassicFSM', FSMInspector.FSMInspector)])
-        print(popupMenu)
-        if popupMenu:
-            popupMenu.post(event.widget.winfo_pointerx(),
-                           event.widget.winfo_pointery())
+        return [('Explore', NodePath.explore),
+                ('Place', NodePath.place),
+                ('Set Color', NodePath.rgbPanel)]
+
+    def _classicFSMMenuList(self):
+        from . import FSMInspector
+        return [('Inspect ClassicFSM', FSMInspector.FSMInspector)]
 
     def createPopupMenu(self, part, menuList):
         popupMenu = tk.Menu(self.top, tearoff = 0)
@@ -0,0 +1,106 @@
+import gc
+import pytest
+pytest.importorskip('tkinter')
+pytest.importorskip('Pmw')
+from direct.tkpanels import Inspector
+
+
+def test_inspectorFor_dispatch():
+    assert type(Inspector.inspectorFor({})) is Inspector.DictionaryInspector
+    assert type(Inspector.inspectorFor([])) is Inspector.SequenceInspector
+    assert type(Inspector.inspectorFor(Inspector)) is Inspector.ModuleInspector
+    assert type(Inspector.inspectorFor(len)) is Inspector.FunctionInspector
+    assert type(Inspector.inspectorFor(object())) is Inspector.Inspector
+
+
+def test_inspectorFor_releases_types():
+    class Temporary:
+        pass
+
+    Inspector.inspectorFor(Temporary())
+    assert Temporary in Inspector._InspectorClassCache
+
+    del Temporary
+    gc.collect()
+    assert not any(cls.__name__ == 'Temporary'
+                   for cls in Inspector._InspectorClassCache.keys())
+
+
+class Thing:
+    pass
+
+
+def test_partNumber_live():
+    thing = Thing()
+    thing.foo = 1
+    inspector = Inspector.inspectorFor(thing)
+    index = inspector.partNames().index('foo')
+
+    assert inspector.partNumber(index) == 1
+    thing.foo = 2
+    assert inspector.partNumber(index) == 2
+    assert inspector.selectedPart() == 2
+
+
+def test_stringForPartNumber_live():
+    thing = Thing()
+    thing.foo = 1
+    inspector = Inspector.inspectorFor(thing)
+    index = inspector.partNames().index('foo')
+
+    assert inspector.stringForPartNumber(index) == '1'
+    thing.foo = 2
+    assert inspector.stringForPartNumber(index) == '2'
+    assert inspector.getLastPartNumber() == index
+
+
+def test_inspectorFor_deleted_attribute():
+    thing = Thing()
+    thing.foo = 1
+    parent = Inspector.inspectorFor([thing])
+    assert 'foo' in parent.inspectorFor(thing).partNames()
+
+    del thing.foo
+    child = parent.inspectorFor(thing)
+    assert 'foo' not in child.partNames()
+    for index in range(len(child.partNames())):
+        child.stringForPartNumber(index)
+
+
+def test_inspectorFor_shrunk_sequence():
+    items = [1, 2, 3]
+    parent = Inspector.inspectorFor([items])
+    assert parent.inspectorFor(items).partNames()[-1] == '2'
+
+    items.pop()
+    child = parent.inspectorFor(items)
+    assert child.partNames()[-1] == '1'
+    for index in range(len(child.partNames())):
+        child.stringForPartNumber(index)
+
+
+def test_popupMenuListFor_plain_object():
+    window = Inspector.InspectorWindow(Inspector.inspectorFor(1))
+    assert window.popupMenuListFor(1) is None
+    assert window.popupMenuListFor('abc') is None
+
+
+def test_DictionaryInspector_key_shadows_attribute():
+    d = {'keys': 5}
+    inspector = Inspector.inspectorFor(d)
+    names = inspector.partNames()
+    assert names.count('keys') == 2
+
+    # The attribute row shows the attribute, the key row shows the value
+    attributeRow = names.index('keys')
+    keyRow = len(names) - 1
+    assert names[keyRow] == 'keys'
+    assert inspector.partNumber(attributeRow) == d.keys
+    assert inspector.partNumber(keyRow) == 5
+
+
+def test_DictionaryInspector_non_str_key():
+    inspector = Inspector.inspectorFor({1: 'x'})
+    names = inspector.partNames()
+    assert names[-1] == '1'
+    assert inspector.partNumber(len(names) - 1) == 'x'